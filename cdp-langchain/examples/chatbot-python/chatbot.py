@@ -1,13 +1,23 @@
+import asyncio
+import atexit
+import io
 import os
 import sys
 import time
 import re
 import json
+import logging
+import logging.handlers
 import random
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 
 from eth_utils import is_address
 from datetime import datetime, timezone
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import unquote
 from decimal import Decimal
 
@@ -21,6 +31,7 @@ from cdp_langchain.agent_toolkits import CdpToolkit
 from cdp_langchain.utils import CdpAgentkitWrapper
 from twitter_langchain import TwitterApiWrapper, TwitterToolkit
 from cdp_langchain.tools import CdpTool
+from cdp_agentkit_core.actions.social.twitter.post_tweet_reply import post_tweet_reply
 from pydantic import BaseModel, Field
 from cdp import Wallet
 from cdp.smart_contract import SmartContract
@@ -29,25 +40,98 @@ from cdp.address_reputation import AddressReputation
 
 from web3 import Web3
 
+import resvg_py
 import subprocess
 
+# Optional fast JSON codec, stdlib json is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
 # Settings
 # ---------
 
 # Config
 wallet_data_file = "wallet_data.txt"
 DEBUG_MODE = False
+LLM_REPLIES = False # compose mint success replies with the agent instead of posting fixed texts
 DUMMY_MENTIONS_FILE = "dummy_mentions.txt"
-MENTION_MEMORY_FILE = "mention_memory.txt"
+MENTION_MEMORY_FILE = "mention_memory.jsonl"
+LEGACY_MENTION_MEMORY_FILE = "mention_memory.txt"
+MEMORY_FSYNC_EVERY = 10 # appended records between fsyncs of the log
+MEMORY_COMPACT_RATIO = 10 # compact once the log holds this many lines per live entry
+MAX_CONCURRENT_TWEETS = 5 # mentions processed in parallel per batch
+SEEN_TWEETS_CAP = 10_000 # recently handled tweet ids remembered across polls
+REPLY_MIN_INTERVAL = 20 # minimum seconds between posted replies
+REPLY_RECURSION_LIMIT = 8 # agent steps allowed for composing a reply
+LLM_MAX_TOKENS = 512 # output token cap per LLM call
+POLL_MAX_INTERVAL = 900 # longest wait between mention polls when idle
+MENTIONS_PAGE_SIZE = 100 # mentions fetched per poll, the API maximum
+RATE_LIMIT_BACKOFF = 900 # wait after a 429, one Twitter rate-limit window
+RENDER_TIMEOUT = 30 # seconds allowed for an external SVG renderer
+ENS_NEGATIVE_TTL = 60 # seconds an unresolvable ENS name stays cached
+FAILED_LOOKUP_TTL = 30 # seconds a failed balance/reputation lookup stays cached
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper() # DEBUG also logs full tool responses and prompts
+LOG_BUFFER_CAPACITY = 256 # log records buffered between writes to stderr
+BOT_ACCOUNT_ID = '1413425385937809414'
 ADMIN_ID = '1340039893595074560'
 ADMIN_NAME = "DukeOphir"
 
-# NFT contract 
+# Etherscan 
+etherscan_api_key = os.getenv('ETHERSCAN_API_KEY')
+if not etherscan_api_key:
+    raise ValueError("ETHERSCAN_API_KEY environment variable is not set")
+
+# Infura
+infura_api = os.getenv('INFURA_API_KEY')
+if not infura_api:
+    raise ValueError("INFURA_API_KEY environment variable is not set")
+
+# Network
+@dataclass(frozen=True)
+class NetworkConfig:
+    """Network dependent contract address and endpoints."""
+    nft_address: str
+    etherscan_url: str
+    tx_explorer: str
+
 network_id = os.getenv('NETWORK_ID')
-NFT_CONTRACT_ADDRESS = "0x692E25F69857ceee22d5fdE61E67De1fcE7EA274" if network_id == "base-mainnet" else "0x32f75546e56aEC829ce13A9b73d4ebb42bF56b9c"
-NFT_PRICE = Decimal("0.001") if network_id == "base-mainnet" else Decimal("0.001") # in ETH
+if network_id == "base-mainnet":
+    NET = NetworkConfig(
+        nft_address="0x692E25F69857ceee22d5fdE61E67De1fcE7EA274",
+        etherscan_url="https://api.basescan.org/api",
+        tx_explorer="https://basescan.org/tx/",
+    )
+else:
+    NET = NetworkConfig(
+        nft_address="0x32f75546e56aEC829ce13A9b73d4ebb42bF56b9c",
+        etherscan_url="https://api-sepolia.basescan.org/api",
+        tx_explorer="https://sepolia.basescan.org/tx/",
+    )
+ETHERSCAN_RECEIPT_URL = (
+    f"{NET.etherscan_url}?module=proxy&action=eth_getTransactionReceipt&txhash={{tx_hash}}&apikey={etherscan_api_key}"
+)
+
+# NFT contract 
+NFT_PRICE_WEI = 1_000_000_000_000_000 # 0.001 ETH on every network
+NFT_PRICE = Decimal(NFT_PRICE_WEI) / Decimal(10**18) # in ETH
+MIN_WALLET_BALANCE = NFT_PRICE * Decimal("1.5") # in ETH, checked at startup
 REPUTATION_THRESHOLD = 20
 
+# Reputation metadata fields used to personalize replies
+KEY_METRICS = {
+    "total_transactions": "transactions",
+    "unique_days_active": "days active",
+    "token_swaps_performed": "token swaps",
+    "smart_contract_deployments": "smart contracts deployed",
+    "lend_borrow_stake_transactions": "lending/borrowing actions",
+    "bridge_transactions_performed": "bridge transactions",
+    "ens_contract_interactions": "ENS interactions"
+}
+
 abi = [
     {
         "inputs": [{"internalType": "address", "name": "recipient", "type": "address"}],
@@ -58,59 +142,279 @@ abi = [
     }
 ]
 
-# Etherscan 
-etherscan_api_key = os.getenv('ETHERSCAN_API_KEY')
-if not etherscan_api_key:
-    raise ValueError("ETHERSCAN_API_KEY environment variable is not set")
-ETHERSCAN_URL = "https://api.basescan.org/api" if network_id == "base-mainnet" else "https://api-sepolia.basescan.org/api"
-
-# Infura
-infura_api = os.getenv('INFURA_API_KEY')
-if not infura_api:
-    raise ValueError("INFURA_API_KEY environment variable is not set")
+TOKEN_URI_ABI = [
+    {
+        "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
+        "name": "tokenURI",
+        "outputs": [{"internalType": "string", "name": "", "type": "string"}],
+        "stateMutability": "view",
+        "type": "function"
+    }
+]
+# tokenURI returns inline JSON metadata whose image is an inline SVG
+JSON_DATA_URI_PREFIX = "data:application/json;utf8,"
+SVG_DATA_URI_PREFIX = "data:image/svg+xml;utf8,"
+
+# Tweet and tool response patterns
+_MENTION_RE = re.compile(r'@(\w+)')
+_ADDRESS_PATTERNS = (
+    re.compile(r"\b0x[a-fA-F0-9]{40}\b"),  # ETH address
+    re.compile(r"\S+\.eth\b"),         # .eth domain 
+)
+_TXHASH_RE = re.compile(r'Transaction hash: (0x[a-fA-F0-9]+)')
+_TXLINK_RE = re.compile(r'Transaction: (https://[^\s\n]+)')
+
+# Reuse connections across etherscan polls
+_etherscan_session = requests.Session()
+_etherscan_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+atexit.register(_etherscan_session.close)
+
+# ENS resolution, always through the L1 Infura endpoint whatever the network
 w3 = Web3(Web3.HTTPProvider(infura_api))
 w3.ens = w3.ens.from_web3(w3)
 
 # Helper classes
 # ---------
+class TTLCache:
+    """Bounded in-memory cache whose entries expire after a fixed time."""
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, evicting the oldest entry when full.
+
+        ttl overrides the cache-wide expiry for this entry.
+        """
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+
+def _json_dumps(obj) -> str:
+    """Serialize obj to a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _json_loads(data):
+    """Deserialize a JSON string, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class RateLimiter:
+    """Space calls at least interval seconds apart across threads."""
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next free slot and claim it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(slot - now)
+
+class MentionsRateLimitedError(Exception):
+    """Raised when the Twitter mentions endpoint returns 429."""
+
+class PollScheduler:
+    """Adapt the polling interval to how often mentions arrive.
+
+    Polls speed up towards half the average time between mentions and back
+    off geometrically while nothing arrives.
+    """
+    def __init__(self, min_interval, max_interval):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._arrival_ema = None
+        self._last_arrival = None
+
+    def next_interval(self, mentions_found):
+        """Record the outcome of a poll and return the time to wait."""
+        if mentions_found:
+            now = time.monotonic()
+            if self._last_arrival is not None:
+                dt = now - self._last_arrival
+                self._arrival_ema = dt if self._arrival_ema is None else 0.7 * self._arrival_ema + 0.3 * dt
+            self._last_arrival = now
+            target = self._arrival_ema / 2 if self._arrival_ema is not None else self.min_interval
+            self.interval = min(max(target, self.min_interval), self.max_interval)
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        return self.interval
+
 class MentionMemory:
-    """Store and manage tweet mentions."""
+    """Store and manage tweet mentions.
+
+    Mentions are persisted as an append-only JSONL log: every update appends a
+    single record to an open handle and the log is compacted from the in-memory
+    state once it grows well past the number of live entries.
+    """
     def __init__(self):
         self.memory = {"mentions": {}, "last_tweet_id": None}
+        self._minted_by_author = {}
+        self._minted_by_address = {}
+        self._log = None
+        self._log_lines = 0
+        self._unsynced_records = 0
+        self._last_tweet_id = 0
+        self._pending_mints = set()
+        self._seen = OrderedDict()
+        self._lock = threading.RLock()
+        self._mint_released = threading.Condition(self._lock)
         self.load_memory()
 
     def load_memory(self):
-        """Load processed mentions from file."""
+        """Load processed mentions by replaying the log file."""
         if os.path.exists(MENTION_MEMORY_FILE):
+            needs_repair = False
+            with open(MENTION_MEMORY_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    # A torn last write leaves a line without its newline
+                    if not line.endswith("\n"):
+                        needs_repair = True
+                    if not line.strip():
+                        continue
+                    self._log_lines += 1
+                    try:
+                        self._apply_record(_json_loads(line))
+                    except ValueError:  # includes JSONDecodeError
+                        logger.warning("Skipping corrupt mention memory record")
+                        needs_repair = True
+            # Rewrite the log, otherwise the next append is glued onto the bad line
+            if needs_repair:
+                self.save_memory()
+        elif os.path.exists(LEGACY_MENTION_MEMORY_FILE):
+            # Migrate the previous single-document JSON format to the log
             try:
-                with open(MENTION_MEMORY_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.memory = data
+                with open(LEGACY_MENTION_MEMORY_FILE, 'r', encoding='utf-8') as f:
+                    self.memory = json.load(f)
+                self.save_memory()
             except json.JSONDecodeError:
-                print("Error loading mention memory, starting fresh")
+                logger.error("Error loading mention memory, starting fresh")
                 self.memory = {"mentions": {}, "last_tweet_id": None}
+        self._last_tweet_id = int(self.memory["last_tweet_id"] or 0)
+        self._build_mint_index()
+
+    def _apply_record(self, record):
+        """Apply a single log record to the in-memory state, raising ValueError if it is malformed."""
+        op = record.get("op") if isinstance(record, dict) else None
+        if op == "add" and "tweet_id" in record and isinstance(record.get("data"), dict):
+            self.memory["mentions"][record["tweet_id"]] = record["data"]
+        elif op == "last_tweet_id" and "value" in record:
+            self.memory["last_tweet_id"] = record["value"]
+        else:
+            raise ValueError(f"Invalid mention memory record: {record!r}")
+
+    def _append_record(self, record):
+        """Append a record to the log, syncing it to disk every few records."""
+        with self._lock:
+            if self._log is None:
+                self._log = open(MENTION_MEMORY_FILE, 'a', encoding='utf-8')
+            self._log.write(_json_dumps(record) + "\n")
+            self._log.flush()
+            self._log_lines += 1
+            self._unsynced_records += 1
+            if self._unsynced_records >= MEMORY_FSYNC_EVERY:
+                self.flush()
+
+    def flush(self):
+        """Flush and fsync appended records to disk."""
+        with self._lock:
+            if self._log is not None and self._unsynced_records:
+                self._log.flush()
+                os.fsync(self._log.fileno())
+            self._unsynced_records = 0
+
+    def compact_memory(self):
+        """Compact the log if it holds many more lines than live entries."""
+        with self._lock:
+            live_entries = len(self.memory["mentions"]) + 1
+            if self._log_lines > MEMORY_COMPACT_RATIO * live_entries:
+                self.save_memory()
+
+    def _build_mint_index(self):
+        """Index successful mints by author id and lowercased address."""
+        self._minted_by_author = {}
+        self._minted_by_address = {}
+        for tweet_id, mention in self.memory["mentions"].items():
+            self._index_mint(tweet_id, mention)
+
+    def _index_mint(self, tweet_id, mention):
+        """Add a mention to the successful mint index if it minted."""
+        if not mention.get("mint_success"):
+            return
+        author = mention.get("author") or {}
+        if author.get("id"):
+            self._minted_by_author.setdefault(author["id"], tweet_id)
+        if mention.get("minted_address"):
+            self._minted_by_address.setdefault(mention["minted_address"].lower(), tweet_id)
     
     def save_memory(self):
-        """Save processed mentions to file."""
-        with open(MENTION_MEMORY_FILE, 'w') as f:
-            json.dump(self.memory, f, indent=2)
+        """Compact the log by atomically rewriting it from the in-memory state."""
+        with self._lock:
+            # The append handle would keep pointing at the replaced file
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            tmp_file = MENTION_MEMORY_FILE + ".tmp"
+            with open(tmp_file, 'w', buffering=1 << 20, encoding='utf-8') as f:
+                if self.memory["last_tweet_id"]:
+                    f.write(_json_dumps({"op": "last_tweet_id", "value": self.memory["last_tweet_id"]}) + "\n")
+                for tweet_id, mention in self.memory["mentions"].items():
+                    f.write(_json_dumps({"op": "add", "tweet_id": tweet_id, "data": mention}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, MENTION_MEMORY_FILE)
+            self._log_lines = len(self.memory["mentions"]) + bool(self.memory["last_tweet_id"])
+            self._unsynced_records = 0
     
     def update_last_tweet_id(self, tweets):
         """Update the last tweet ID from a list of tweets."""
-        if tweets:
-            # Get the newest tweet ID
-            newest_id = max(int(tweet["id"]) for tweet in tweets)
-            # Update if it's newer than what we have
-            if not self.memory["last_tweet_id"] or int(newest_id) > int(self.memory["last_tweet_id"]):
-                self.memory["last_tweet_id"] = str(newest_id)
-                self.save_memory()
+        newest_id = max((int(tweet["id"]) for tweet in tweets), default=None)
+        # Only persist when a newer tweet arrived
+        if newest_id is not None and newest_id > self._last_tweet_id:
+            self._last_tweet_id = newest_id
+            self.memory["last_tweet_id"] = str(newest_id)
+            self._append_record({"op": "last_tweet_id", "value": self.memory["last_tweet_id"]})
 
     def is_processed(self, tweet_id):
         """Check if a tweet has been processed."""
         return tweet_id in self.memory["mentions"]
+
+    def is_seen(self, tweet_id):
+        """Check if a tweet was already handled in this run, stored or not."""
+        return tweet_id in self._seen
+
+    def mark_seen(self, tweet_id):
+        """Remember a handled tweet, forgetting the oldest beyond SEEN_TWEETS_CAP."""
+        with self._lock:
+            self._seen[tweet_id] = None
+            self._seen.move_to_end(tweet_id)
+            if len(self._seen) > SEEN_TWEETS_CAP:
+                self._seen.popitem(last=False)
     
-    def add_mention(self, tweet_id, tweet_text, status, mint_success=False, tx_hash=None, minted_address=None, minted_domain=None, minted_nft_name=None, author=None, author_id=None, reply_id=None):
-        """Add a processed mention to memory."""
+    def add_mention(self, tweet_id, tweet_text, status, mint_success=False, tx_hash=None, minted_address=None, minted_domain=None, minted_nft_name=None, author=None, author_id=None, reply_id=None, extra=None):
+        """Add a processed mention to memory, with optional extra fields."""
         # Don't save not_mint_request mentions
         if status == "not_mint_request":
             return
@@ -134,25 +438,85 @@ class MentionMemory:
             mention_data["minted_nft_name"] = minted_nft_name
         if reply_id:
             mention_data["reply_id"] = reply_id
+        if extra:
+            mention_data.update(extra)
             
-        self.memory["mentions"][tweet_id] = mention_data
-        self.save_memory()
+        with self._lock:
+            self.memory["mentions"][tweet_id] = mention_data
+            self._index_mint(tweet_id, mention_data)
+            self._append_record({"op": "add", "tweet_id": tweet_id, "data": mention_data})
+
+    def update_mention(self, tweet_id, **fields):
+        """Update fields of a stored mention, ignoring empty values."""
+        with self._lock:
+            mention = self.memory["mentions"][tweet_id]
+            mention.update({key: value for key, value in fields.items() if value is not None})
+            self._index_mint(tweet_id, mention)
+            self._append_record({"op": "add", "tweet_id": tweet_id, "data": mention})
+
+    def pending_replies(self):
+        """Return tweet ids of successful mints whose reply was not sent yet."""
+        return [tweet_id for tweet_id, mention in self.memory["mentions"].items() if mention.get("reply_pending")]
 
     def has_successful_mint(self, author_id, address=None):
         """Check if author or address has already minted successfully."""
-        for tweet_id, mention in self.memory["mentions"].items():
-            if mention.get("mint_success"):
-                # Check both author.id and minted_address
-                author = mention.get("author", {})
-                if (author.get("id") == author_id or 
-                    (address and mention.get("minted_address", "").lower() == address.lower())):
-                    return tweet_id
-        return None
+        previous_tweet_id = self._minted_by_author.get(author_id)
+        if previous_tweet_id is None and address:
+            previous_tweet_id = self._minted_by_address.get(address.lower())
+        return previous_tweet_id
+
+    def reserve_mint(self, author_id, address):
+        """Atomically reserve a mint for author and address.
+
+        Waits while either has a mint in flight, then returns False if either
+        has already minted.
+        """
+        keys = [key for key in (author_id, address.lower()) if key]
+        with self._mint_released:
+            self._mint_released.wait_for(lambda: not any(key in self._pending_mints for key in keys))
+            if self.has_successful_mint(author_id, address):
+                return False
+            self._pending_mints.update(keys)
+            return True
+
+    def release_mint(self, author_id, address):
+        """Release the in-flight mint reservation for author and address."""
+        with self._mint_released:
+            self._pending_mints.difference_update((author_id, address.lower()))
+            self._mint_released.notify_all()
 
 # Helper onchain functions
 # ---------
+
+# Reputation changes slowly, balances can change between mentions
+_reputation_cache = TTLCache(maxsize=1024, ttl=600)
+_balance_cache = TTLCache(maxsize=1024, ttl=60)
+# Distinguishes a cache miss from a cached None (failed lookup)
+_CACHE_MISS = object()
+# Runs independent per-address lookups side by side
+_lookup_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="lookup")
+# Set on shutdown so lookups stop retrying instead of holding up interpreter exit
+_lookup_stop = threading.Event()
+_inflight_lookups = {}
+_inflight_lock = threading.Lock()
+
+def _submit_lookup(lookup, address):
+    """Submit lookup(address), sharing one in-flight call per function and address."""
+    key = (lookup.__name__, address.lower())
+    with _inflight_lock:
+        future = _inflight_lookups.get(key)
+        if future is None:
+            future = _lookup_executor.submit(lookup, address)
+            _inflight_lookups[key] = future
+            future.add_done_callback(lambda _: _inflight_lookups.pop(key, None))
+        return future
+
 def get_eth_balance(address: str):
     """Check if address has non-zero ETH balance using CDP SDK."""
+    cached = _balance_cache.get(address.lower(), _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return cached
+
     try:
         # Create Address object for the given address
         addr = Address(
@@ -161,15 +525,21 @@ def get_eth_balance(address: str):
         )
         # Get ETH balance
         balance_eth = addr.balance("eth")
-        print(f"ETH Balance for {address}: {balance_eth} ETH")
+        logger.info("ETH Balance for %s: %s ETH", address, balance_eth)
+        _balance_cache.set(address.lower(), balance_eth)
         return balance_eth
 
     except Exception as e:
-            print(f"Error checking ETH balance: {e}")
+            logger.error("Error checking ETH balance: %s", e)
+            _balance_cache.set(address.lower(), None, ttl=FAILED_LOOKUP_TTL)
             return None
 
 def check_reputation(address: str, max_retries=2, delay=30) -> AddressReputation:
     """Check if address reputation using CDP SDK."""
+    cached = _reputation_cache.get(address.lower(), _CACHE_MISS)
+    if cached is not _CACHE_MISS:
+        return cached
+
     for attempt in range(max_retries + 1): 
         try:
             addr = Address(
@@ -177,44 +547,57 @@ def check_reputation(address: str, max_retries=2, delay=30) -> AddressReputation
                 address_id=address
             )
             reputation = addr.reputation()
-            print(f"Reputation for {address}: {reputation}. \n")
+            logger.debug("Reputation for %s: %s", address, reputation)
+            _reputation_cache.set(address.lower(), reputation)
             return reputation
         except Exception as e:
-            print(f"Error checking reputation (attempt {attempt + 1}/{max_retries + 1}): {e}")
+            logger.error("Error checking reputation (attempt %s/%s): %s", attempt + 1, max_retries + 1, e)
             if attempt < max_retries:  
-                print(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
+                logger.info("Retrying in %s seconds...", delay)
+                if _lookup_stop.wait(delay):
+                    return None
             else:
+                # Avoid repeating the whole retry loop for the same address right away
+                _reputation_cache.set(address.lower(), None, ttl=FAILED_LOOKUP_TTL)
                 return None
 
+_ens_cache = TTLCache(maxsize=1024, ttl=600)
+
 def resolve_ens(domain):
     """Resolve ENS domain to address using Base L2 resolver."""
-    global w3  # Access the global w3 instance
+    key = domain.lower()
+    address = _ens_cache.get(key, _CACHE_MISS)
+    if address is not _CACHE_MISS:
+        return address, domain
     try:
         address = w3.ens.address(domain)
-        print(f"Resolved {domain} to {address}")
+        logger.info("Resolved %s to %s", domain, address)
+        # Unresolvable names are cached briefly to absorb repeated spam
+        _ens_cache.set(key, address, ttl=None if address else ENS_NEGATIVE_TTL)
         return address, domain
     except Exception as e:
-        print(f"Error resolving ENS domain: {e}")
+        logger.error("Error resolving ENS domain: %s", e)
         return None, None
 
-def get_transaction_data(tx_hash, max_retries=4, delay=25):
-    """Get transaction data from etherscan with retries."""
-    url = f"{ETHERSCAN_URL}?module=proxy&action=eth_getTransactionReceipt&txhash={tx_hash}&apikey={etherscan_api_key}"
+def get_transaction_data(tx_hash, max_retries=10, initial_delay=1, max_delay=20):
+    """Get transaction data from etherscan, retrying with exponential backoff."""
+    url = ETHERSCAN_RECEIPT_URL.format(tx_hash=tx_hash)
     
     for attempt in range(max_retries):
-        print(f"Getting transaction data for {tx_hash} from etherscan: {ETHERSCAN_URL} (Attempt {attempt + 1}/{max_retries})")
+        logger.info("Getting transaction data for %s from etherscan: %s (Attempt %s/%s)", tx_hash, NET.etherscan_url, attempt + 1, max_retries)
 
-        response = requests.get(url)
-        data = response.json()
-        print(f"Transaction data: {data}")
+        try:
+            data = _json_loads(_etherscan_session.get(url, timeout=10).content)
+        except (requests.RequestException, ValueError) as e:
+            logger.error("Error fetching transaction data: %s", e)
+            data = {}
 
         # Check if we have a valid result
         if data.get('result'):
             # Check transaction status (1 = success, 0 = failure)
             status = int(data['result'].get('status', '0'), 16)
             if status == 0:
-                print("Transaction failed")
+                logger.warning("Transaction failed")
                 return None, None, False
 
             # Transaction successful, get logs
@@ -227,19 +610,45 @@ def get_transaction_data(tx_hash, max_retries=4, delay=25):
                         contract_address = last_log['address']
                         return int_value, contract_address, True
                 except Exception as e:
-                    print(f"Error parsing log data: {e}")
+                    logger.error("Error parsing log data: %s", e)
 
         if attempt < max_retries - 1:  # Don't sleep on the last attempt
-            print(f"Transaction data not ready yet, waiting {delay} seconds before retry...")
+            # The mint is already confirmed, so the receipt usually shows up within seconds
+            delay = min(initial_delay * 1.7 ** attempt, max_delay)
+            logger.info("Transaction data not ready yet, waiting %.1f seconds before retry...", delay)
             time.sleep(delay)
         else:
-            print("Max retries reached, transaction data not available")
+            logger.warning("Max retries reached, transaction data not available")
 
     return None, None, False  
 
-def save_svg_to_png(contract_address, token_id, svg_content) -> str:
+def _convert_svg_with_cli(svg_bytes) -> bytes:
+    """Convert SVG bytes to PNG bytes using rsvg-convert or inkscape as fallback."""
+    # Try rsvg-convert first
+    try:
+        result = subprocess.run(["rsvg-convert", "-f", "png"], input=svg_bytes, capture_output=True, check=True, timeout=RENDER_TIMEOUT)
+        logger.info("Converted SVG to PNG using rsvg-convert")
+        return result.stdout
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+        # If rsvg-convert fails, try inkscape
+        try:
+            result = subprocess.run(
+                ["inkscape", "--pipe", "--export-type=png", "--export-filename=-"],
+                input=svg_bytes, capture_output=True, check=True, timeout=RENDER_TIMEOUT
+            )
+            logger.info("Converted SVG to PNG using Inkscape")
+            return result.stdout
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError) as e:
+            logger.warning("Both rsvg-convert and Inkscape failed: %s", e)
+            return None
+
+def save_svg_to_png(contract_address, token_id, svg_content) -> bytes:
     """
-    Saves the given SVG content as a PNG file using rsvg-convert or inkscape as fallback.
+    Converts the given SVG content to PNG bytes.
+
+    Renders in-process with resvg and falls back to streaming the SVG through rsvg-convert
+    or inkscape. The SVG and PNG are written once each for archiving, the conversion itself
+    never reads them back from disk.
 
     Parameters:
         contract_address (str): The contract address for the file name.
@@ -247,41 +656,46 @@ def save_svg_to_png(contract_address, token_id, svg_content) -> str:
         svg_content (str): The SVG content as a string.
     """
     try:
-        file_name = f"output_{contract_address}_{token_id}.png"
-        
         # Ensure SVG content is properly formatted
         if not svg_content.strip().startswith('<svg'):
-            print("Invalid SVG content")
+            logger.warning("Invalid SVG content")
             return None
 
-        # Save svg content to a temporary file
-        svg_file = f"output_{contract_address}_{token_id}.svg"
-        with open(svg_file, "w") as f:
-            f.write(svg_content)
-
-        # Try rsvg-convert first
         try:
-            subprocess.run(["rsvg-convert", "-o", file_name, svg_file], check=True)
-            print(f"Converted SVG to PNG using rsvg-convert: {file_name}")
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            # If rsvg-convert fails, try inkscape
-            try:
-                subprocess.run(["inkscape", "-o", file_name, svg_file], check=True)
-                print(f"Converted SVG to PNG using Inkscape: {file_name}")
-            except (subprocess.CalledProcessError, FileNotFoundError) as e:
-                print(f"Both rsvg-convert and Inkscape failed: {e}")
+            png_bytes = resvg_py.svg_to_bytes(svg_string=svg_content)
+            logger.info("Converted SVG to PNG using resvg")
+        except Exception as e:
+            logger.warning("resvg failed, falling back to external converters: %s", e)
+            png_bytes = _convert_svg_with_cli(svg_content.encode("utf-8"))
+            if png_bytes is None:
                 return None
 
-        print(f"SVG saved as PNG: {file_name}")
-        return file_name
+        # Keep the rendered files, the daily workflow archives them as artifacts
+        file_name = f"output_{contract_address}_{token_id}"
+        with open(f"{file_name}.svg", "w") as f:
+            f.write(svg_content)
+        with open(f"{file_name}.png", "wb") as f:
+            f.write(png_bytes)
+        logger.info("SVG saved as PNG: %s.png", file_name)
+        return png_bytes
     
     except Exception as e:
-        print(f"Error saving SVG to PNG: {e}")
+        logger.error("Error saving SVG to PNG: %s", e)
         return None
 
 # Mint nft functions
 # ---------
-MINT_MYNFT_PROMPT = """
+
+# Background worker for post-mint rendering and replies
+_reply_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mint-reply")
+# Serializes agent conversations, which share one checkpointer thread
+_agent_lock = threading.Lock()
+# Serializes mint transactions so the wallet nonce stays in order
+_mint_lock = threading.Lock()
+# Paces replies to stay within Twitter's write limits, without stalling lookups or mints
+_reply_limiter = RateLimiter(REPLY_MIN_INTERVAL)
+
+MINT_MYNFT_PROMPT = f"""
 This tool will mint a Xonin NFT and transfer it directly to the specified address by paying {NFT_PRICE} ETH.
 The NFT will be minted and transferred in a single transaction.
 """
@@ -293,33 +707,37 @@ class MintMyNftInput(BaseModel):
         description="The address that will receive the minted NFT"
     )
 
+# tokenURI of a minted token never changes
+_token_uri_cache = TTLCache(maxsize=512, ttl=float("inf"))
+
 def get_token_uri_and_svg(wallet: Wallet, contract_address: str, token_id: int) -> tuple[str, str, str]:
     """Get tokenURI and extract name and SVG from the response."""
-    print("Getting tokenURI and SVG from contract")
+    cache_key = (contract_address.lower(), int(token_id))
+    cached = _token_uri_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    logger.info("Getting tokenURI and SVG from contract")
     try:
         # Call tokenURI function
         token_uri = SmartContract.read(
             wallet.network_id,
             contract_address,
-            abi=[{
-                "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
-                "name": "tokenURI",
-                "outputs": [{"internalType": "string", "name": "", "type": "string"}],
-                "stateMutability": "view",
-                "type": "function"
-            }],
+            abi=TOKEN_URI_ABI,
             method="tokenURI",
             args={"tokenId": str(token_id)}
         )
 
-        # Extract the JSON part after data:application/json;utf8,
-        json_str = token_uri.split('data:application/json;utf8,')[1]
-        json_data = json.loads(unquote(json_str))
+        # Extract the JSON part after the data URI prefix
+        json_str = token_uri[token_uri.index(JSON_DATA_URI_PREFIX) + len(JSON_DATA_URI_PREFIX):]
+        json_data = _json_loads(unquote(json_str))
         
         # Extract name and SVG
         name = json_data['name']
-        svg_data = json_data['image'].split('data:image/svg+xml;utf8,')[1]
+        image = json_data['image']
+        svg_data = image[image.index(SVG_DATA_URI_PREFIX) + len(SVG_DATA_URI_PREFIX):]
         
+        _token_uri_cache.set(cache_key, (token_uri, name, svg_data))
         return token_uri, name, svg_data
 
     except Exception as e:
@@ -328,9 +746,9 @@ def get_token_uri_and_svg(wallet: Wallet, contract_address: str, token_id: int)
 def mint_myNft(wallet: Wallet, recipient_address: str) -> str:
     """Mint a Xonin NFT and transfer it to the specified address."""  
     try:
-        print(f"Minting NFT for {recipient_address} from contract {NFT_CONTRACT_ADDRESS} on network {network_id} with price {NFT_PRICE} ETH")
+        logger.info("Minting NFT for %s from contract %s on network %s with price %s ETH", recipient_address, NET.nft_address, network_id, NFT_PRICE)
         mint_invocation = wallet.invoke_contract(
-            contract_address=NFT_CONTRACT_ADDRESS,
+            contract_address=NET.nft_address,
             abi=abi,
             method="mintAndTransfer",
             args={"recipient": recipient_address},
@@ -350,40 +768,100 @@ def mint_myNft(wallet: Wallet, recipient_address: str) -> str:
 # Twitter functions
 # ---------
 
+_json_decoder = json.JSONDecoder()
+
+def _parse_json_payload(response):
+    """Parse the JSON object that tool responses append after their status line."""
+    json_start = response.find('{')
+    if json_start == -1:
+        raise json.JSONDecodeError("No JSON object found", response, 0)
+    data, _ = _json_decoder.raw_decode(response, json_start)
+    return data
+
+def _attach_authors(data):
+    """Return the tweets of a mentions payload with author usernames attached."""
+    authors = {user["id"]: user["username"] for user in data.get("includes", {}).get("users", [])}
+    tweets = data.get("data", [])
+    if not authors:
+        return tweets
+    for tweet in tweets:
+        username = authors.get(tweet.get("author_id"))
+        if username:
+            tweet["author_username"] = username
+    return tweets
+
+def _parse_reply_id(response):
+    """Extract the posted tweet id from a post_tweet_reply tool response."""
+    try:
+        data = _parse_json_payload(response)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(data.get("data"), dict):
+        return data["data"].get("id")
+    return None
+
+def _log_prompt_cache_usage(chunk):
+    """Log how many prompt tokens of an agent step were served from the provider cache."""
+    if "agent" not in chunk:
+        return
+    usage = getattr(chunk["agent"]["messages"][0], "usage_metadata", None)
+    if usage:
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0)
+        logger.debug("LLM input tokens: %s (cached: %s)", usage.get("input_tokens"), cached)
+
+def _make_greeting(author, tagged_user=None):
+    """Return the @-mention to address a reply to, the tagged user for admin requests."""
+    if author == ADMIN_NAME and tagged_user:
+        return f"@{tagged_user}"
+    return f"@{author}" if author else ""
+
+def _send_reply_and_get_id(agent_executor, config, reply_prompt):
+    """Let the agent post a reply from the prompt and return its id."""
+    reply_id = None
+    _reply_limiter.wait()
+    logger.info("Sending reply tweet...")
+    with _agent_lock:
+        for chunk in agent_executor.stream(
+            {"messages": [HumanMessage(content=reply_prompt)]}, {**config, "recursion_limit": REPLY_RECURSION_LIMIT}
+        ):
+            _log_prompt_cache_usage(chunk)
+            if "tools" in chunk:
+                response = chunk["tools"]["messages"][0].content
+                logger.debug("Reply response: %s", response)
+                reply_id = _parse_reply_id(response)
+                # Stop once the reply is posted, the remaining agent output is discarded
+                if reply_id:
+                    break
+    return reply_id
+
+def _post_reply_direct(twitter_wrapper, tweet_id, reply_text, media_id=None):
+    """Post a pre-formatted reply without going through the agent and return its id."""
+    _reply_limiter.wait()
+    logger.info("Sending reply tweet: %s", reply_text)
+    response = twitter_wrapper.run_action(post_tweet_reply, tweet_id=tweet_id, tweet_reply=reply_text, media_id=media_id)
+    logger.debug("Reply response: %s", response)
+    return _parse_reply_id(response)
+
 def get_dummy_mentions():
     """Get mentions from dummy file for debugging."""
     if not os.path.exists(DUMMY_MENTIONS_FILE):
-        print(f"Warning: {DUMMY_MENTIONS_FILE} not found")
+        logger.warning("%s not found", DUMMY_MENTIONS_FILE)
         return []
         
     try:
         with open(DUMMY_MENTIONS_FILE, 'r') as f:
-            data = json.load(f)
-            if "data" in data:
-                # Create author lookup from includes
-                authors = {}
-                if "includes" in data and "users" in data["includes"]:
-                    for user in data["includes"]["users"]:
-                        authors[user["id"]] = user["username"]
-                
-                # Add author username to each tweet
-                tweets = data["data"]
-                for tweet in tweets:
-                    if "author_id" in tweet and tweet["author_id"] in authors:
-                        tweet["author_username"] = authors[tweet["author_id"]]
-                
-                return tweets
+            return _attach_authors(_json_loads(f.read()))
     except json.JSONDecodeError as e:
-        print(f"Error parsing dummy mentions file: {e}")
+        logger.error("Error parsing dummy mentions file: %s", e)
     except Exception as e:
-        print(f"Error reading dummy mentions file: {e}")
+        logger.error("Error reading dummy mentions file: %s", e)
     
     return []
 
 def get_all_mentions(account_mentions_tool, account_id, max_results=10, since_id=None):
     """Get the latest mentions."""
     if DEBUG_MODE:
-        print("DEBUG MODE: Reading from dummy mentions file")
+        logger.info("DEBUG MODE: Reading from dummy mentions file")
         return get_dummy_mentions()
     
     # Add since_id and max_results to the API call if we have them
@@ -394,35 +872,30 @@ def get_all_mentions(account_mentions_tool, account_id, max_results=10, since_id
         params["max_results"] = max_results
     
     response = account_mentions_tool._run(**params)
-    print("Mentions response:", response)
+    logger.debug("Mentions response: %s", response)
+    if response.startswith("Error") and "429" in response:
+        raise MentionsRateLimitedError(response)
     
     try:
-        json_start = response.find('{')
-        json_end = response.rfind('}') + 1
-        json_str = response[json_start:json_end]
-        
-        data = json.loads(json_str)
-        if "data" in data:
-            # Create author lookup from includes
-            authors = {}
-            if "includes" in data and "users" in data["includes"]:
-                for user in data["includes"]["users"]:
-                    authors[user["id"]] = user["username"]
-            
-            # Add author username to each tweet
-            tweets = data["data"]
-            for tweet in tweets:
-                if "author_id" in tweet and tweet["author_id"] in authors:
-                    tweet["author_username"] = authors[tweet["author_id"]]
-            
-            return tweets
+        return _attach_authors(_parse_json_payload(response))
     except json.JSONDecodeError as e:
-        print(f"Error parsing JSON response: {e}")
+        logger.error("Error parsing JSON response: %s", e)
     
     return []
 
-def is_valid_mint_request_with_feedback(tweet_text):
-    """Check if tweet contains an address or ENS domain and provide feedback."""
+def _may_contain_address(tweet_text):
+    """Cheap prefilter: whether the address patterns can match the tweet at all."""
+    return "0x" in tweet_text or ".eth" in tweet_text
+
+def _find_address_candidate(tweet_text):
+    """Find the 0x address or .eth domain of a mint request without any network call.
+
+    Returns (candidate, tagged_user), candidate is None if the tweet is not a mint request.
+    """
+
+    # Most mentions are not mint requests, skip the parsing unless the address patterns can match
+    if not _may_contain_address(tweet_text):
+        return None, None
     
     # Split text into words and find where leading mentions end
     words = tweet_text.split()
@@ -440,249 +913,239 @@ def is_valid_mint_request_with_feedback(tweet_text):
     
     # Check for tagged user in actual message (ignore @XoninNFT)
     tagged_user = None
-    for match in re.finditer(r'@(\w+)', actual_message):
+    for match in _MENTION_RE.finditer(actual_message):
         username = match.group(1)
         if username != "XoninNFT":  # Skip XoninNFT mentions
             tagged_user = username
             break  # Take first non-XoninNFT tag
 
     # Search for 0x address or .eth domain
-    patterns = [
-        r"0x[a-fA-F0-9]{40}",  # ETH address
-        r"\S+\.eth\b",         # .eth domain 
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, actual_message)
+    for pattern in _ADDRESS_PATTERNS:
+        match = pattern.search(actual_message)
         if match:
-            # If ENS domain, try to resolve 
-            address = match.group(0)            
-            domain = None
-            if '.eth' in address:
-                try:
-                    resolved, domain = resolve_ens(address)
-                    if not resolved:
-                        return address, domain, "invalid_address", tagged_user
-                    address = resolved
-                except Exception as e:
-                    print(f"Error resolving ENS domain: {e}")
-                    return address, domain, "invalid_address", tagged_user
-            
-            # Validate the address
-            if not is_address(address):
-                return address, domain, "invalid_address", tagged_user
-                
-            return address, domain, "valid", tagged_user
+            return match.group(0), tagged_user
     
-    return None, None, None, tagged_user
+    return None, tagged_user
 
-def process_mint_request(agent_executor, wallet: Wallet, config, tweet_id, eth_address, domain, twitter_wrapper, author=None, reputation: AddressReputation=None, tagged_user=None):
-    """Process an NFT mint request."""
+def _validate_address(candidate):
+    """Resolve an ENS domain if needed and validate the address.
 
-    print(f"Starting mint process for {eth_address}...")
+    Returns (address, domain, status) with status "valid" or "invalid_address".
+    """
+    address = candidate
+    domain = None
+    if '.eth' in address:
+        try:
+            resolved, domain = resolve_ens(address)
+            if not resolved:
+                return address, domain, "invalid_address"
+            address = resolved
+        except Exception as e:
+            logger.error("Error resolving ENS domain: %s", e)
+            return address, domain, "invalid_address"
+    
+    # Validate the address
+    if not is_address(address):
+        return address, domain, "invalid_address"
+        
+    return address, domain, "valid"
+
+def process_mint_request(wallet: Wallet, eth_address):
+    """Mint an NFT and wait for its transaction receipt.
+
+    Returns (success, tx_hash, tx_link, token_id, contract_address). Rendering the NFT
+    and replying is left to finalize_mint_reply so it stays off the mint path.
+    """
+
+    logger.info("Starting mint process for %s...", eth_address)
 
     # Mint NFT
-    mint_result = mint_myNft(wallet, eth_address)
-    print(f"Mint response: {mint_result}")
+    with _mint_lock:
+        mint_result = mint_myNft(wallet, eth_address)
+    logger.debug("Mint response: %s", mint_result)
     
     # Extract transaction hash and link from the result
-    txHash = re.search(r'Transaction hash: (0x[a-fA-F0-9]+)', mint_result)
+    txHash = _TXHASH_RE.search(mint_result)
     if not txHash:
         raise ValueError("Could not find transaction hash in mint response")
     txHash = txHash.group(1)
     
-    txLink = re.search(r'Transaction: (https://[^\s\n]+)', mint_result)
+    txLink = _TXLINK_RE.search(mint_result)
     if not txLink:
         # Construct link if not found
-        base_url = "https://basescan.org/tx/" if network_id == "base-mainnet" else "https://sepolia.basescan.org/tx/"
-        txLink = base_url + txHash
+        txLink = NET.tx_explorer + txHash
     else:
         txLink = txLink.group(1)    
-    print(f"Transaction hash: {txHash}")
-    print(f"Transaction link: {txLink}")
+    logger.info("Transaction hash: %s", txHash)
+    logger.info("Transaction link: %s", txLink)
 
     # Get transaction info
     token_id, contract_address, success = get_transaction_data(txHash)
     if not success:
-        print("Transaction failed")
-        return False, txHash, None
+        logger.warning("Transaction failed")
+        return False, txHash, txLink, None, None
 
     if token_id is None or contract_address is None:
-        print("Could not get token data from transaction")
-        return False, txHash, None
-
-    # Get token URI, name and SVG after minting
-    token_uri, name, svg_data = get_token_uri_and_svg(wallet, contract_address, token_id)
-    if not name or not svg_data:
-        print("Could not get token URI and SVG")
-        return False, txHash, None
+        logger.warning("Could not get token data from transaction")
+        return False, txHash, txLink, None, None
+
+    return True, txHash, txLink, token_id, contract_address
+
+# Reply templates
+ERROR_REPLY_TEXTS = {
+    "invalid_address": (
+        "Hey {greeting}! Sorry, {address} is not a valid address. Please provide a valid eth address or ENS/basename."
+        " You can always mint your NFT at https://xonin.vercel.app/"
+    ),
+    "zero_balance": (
+        "Haiyaa {greeting}, why so poor? The address {address} has 0 ETH on @base. Get some ETH first,"
+        " or mint your NFT at https://xonin.vercel.app/"
+    ),
+    "already_minted": (
+        "Hey {greeting}! You have already minted an NFT. It's limited to 1 per user or address, don't be greedy!"
+        " You can mint another one yourself at https://xonin.vercel.app/"
+    ),
+    "low_reputation": (
+        "Haiyaa {greeting}, your onchain reputation score is only {score}. Why so low?"
+        " Sorry, no free NFT for you.{metric_text}"
+    ),
+}
+MINT_REPLY_TEXT = (
+    "Fuiyoh {greeting}, your @CoinbaseDev onchain reputation score is {score}! That's so based!{metric_text}"
+    " I minted {name} for you, fully onchain art on @base: {tx_link} Learn more at https://xonin.vercel.app/"
+)
+MINT_REPLY_PROMPT = (
+    "Use post_tweet_reply {media_id_message} to reply to tweet {tweet_id} with a personalized message about the successful mint such as:\n"
+    "'Fuiyoh {greeting}, your @CoinbaseDev onchain reputation score is {score}! That's so based!"
+    " I minted {name} for you! Visit https://xonin.vercel.app/ to learn more! Have fun with your fully onchain art on @base: {tx_link}.'"
+    "{metric_msg}"
+    " Be creative in conveying the message. If you get '403 Forbidden' error, try again ensuring the message is below 280 characters!"
+)
+
+def _reputation_metrics(reputation: AddressReputation, positive_only=False):
+    """Map KEY_METRICS labels to the reputation's metric values, skipping missing ones."""
+    metrics = {}
+    for key, label in KEY_METRICS.items():
+        value = getattr(reputation.metadata, key, None)
+        if value is not None and (value > 0 or not positive_only):
+            metrics[label] = value
+    return metrics
+
+def finalize_mint_reply(agent_executor, wallet: Wallet, config, twitter_wrapper, mention_memory, tweet_id, reputation: AddressReputation=None):
+    """Render the minted NFT, upload it to Twitter and post the success reply."""
+    mention = mention_memory.memory["mentions"][tweet_id]
+    author = (mention.get("author") or {}).get("username")
+    tagged_user = mention.get("tagged_user")
+    token_id = mention["token_id"]
+    contract_address = mention["contract_address"]
+    txLink = mention["transaction_link"]
+
+    name = None
+    reply_id = None
+    try:
+        # Reputation is not persisted, look it up again when resuming after a restart
+        if reputation is None:
+            reputation = check_reputation(mention["minted_address"])
+            if reputation is None:
+                raise RuntimeError(f"Error checking reputation for address: {mention['minted_address']}")
+
+        # Get token URI, name and SVG after minting
+        token_uri, name, svg_data = get_token_uri_and_svg(wallet, contract_address, token_id)
+        if not name or not svg_data:
+            raise ValueError("Could not get token URI and SVG")
+
+        logger.info("Minted NFT: %s", name)
+
+        # Get Twitter API wrapper from tools list
+        twitter_client = twitter_wrapper.v1_api
+
+        # Upload media to Twitter
+        media_id = None
+        png_bytes = save_svg_to_png(contract_address, token_id, svg_data)
+        if not png_bytes:
+            logger.warning("Failed to convert SVG to PNG")
+        else:
+            media = twitter_client.media_upload(filename=f"xonin_{token_id}.png", file=io.BytesIO(png_bytes))
+            if not media:
+                logger.warning("Failed to upload media to Twitter")        
+            else: 
+                media_id = media.media_id_string
+                logger.info("Uploaded media to Twitter, ID: %s", media_id)
 
-    print(f"Minted NFT: {name}")
+        # Send reply with greeting 
+        greeting = _make_greeting(author, tagged_user)
 
-    # Get Twitter API wrapper from tools list
-    twitter_client = twitter_wrapper.v1_api
+        # Select reputation metric to praise (optionally)
+        metric_msg = ""
+        metric_text = ""
+        if reputation.score > 0:
+            positive_metrics = _reputation_metrics(reputation, positive_only=True)
+
+            # Randomly choose one positive metric if any exist
+            if positive_metrics:
+                key, value = random.choice(list(positive_metrics.items()))
+                logger.info("Selected metric: %s %s", value, key)
+                metric_text = f" {value} {key}, respect!"
+                metric_msg = ( f" Or use this info to praise the user: '{value} {key}' in addition to a message like:"
+                               f"'Fuiyoh {greeting}, your @CoinbaseDev onchain reputation score is {reputation.score}!"
+                               f" I minted {name} for you, an original piece of fully onchain art on @base: {txLink}!'"
+                )
 
-    # Upload media to Twitter
-    png_file = save_svg_to_png(contract_address, token_id, svg_data)
-    if not png_file:
-        print("Failed to convert SVG to PNG")
-    else:
-        media = twitter_client.media_upload(png_file)
-        if not media:
-            print("Failed to upload media to Twitter")        
-        else: 
-            media_id = media.media_id_string
-            print(f"Uploaded media to Twitter, ID: {media_id}")
-
-    # Send reply with greeting 
-    greeting = f"@{author}" if author else ""
-    if author == ADMIN_NAME and tagged_user:
-        greeting = f"@{tagged_user}" 
-
-    # Select reputation metric to praise (optionally)
-    metric_msg = ""
-    if reputation.score > 0:
-        # Extract metrics from metadata
-        metadata_str = str(reputation.metadata)
-        key_metrics = {
-            "total_transactions": "transactions",
-            "unique_days_active": "days active",
-            "token_swaps_performed": "token swaps",
-            "smart_contract_deployments": "smart contracts deployed",
-            "lend_borrow_stake_transactions": "lending/borrowing actions",
-            "bridge_transactions_performed": "bridge transactions",
-            "ens_contract_interactions": "ENS interactions"
-        }
-        
-        # Find all metrics with values > 0
-        positive_metrics = {}
-        for key, label in key_metrics.items():
-            match = re.search(f"{key}=(-?\d+)", metadata_str)
-            if match:
-                value = int(match.group(1))
-                if value > 0:
-                    positive_metrics[label] = value
-
-        # Randomly choose one positive metric if any exist
-        if positive_metrics:
-            key, value = random.choice(list(positive_metrics.items()))
-            print(f"Selected metric: {value} {key}")
-            metric_msg = ( f" Or use this info to praise the user: '{positive_metrics[key]} {key}' in addition to a message like:"
-                           f"'Fuiyoh {greeting}, your @CoinbaseDev onchain reputation score is {reputation.score}!"
-                           f" I minted {name} for you, an original piece of fully onchain art on @base: {txLink}!'"
+        # Post reply with media
+        if not LLM_REPLIES:
+            reply_text = MINT_REPLY_TEXT.format(
+                greeting=greeting, score=reputation.score, metric_text=metric_text, name=name, tx_link=txLink
             )
-
-    # Post reply with media
-    media_id_message = f"and attach the media_id: {media_id}" if media_id else ""
-    reply_prompt = (
-        f"Use post_tweet_reply {media_id_message} to reply to tweet {tweet_id} with a personalized message about the successful mint such as:\n"
-        f"'Fuiyoh {greeting}, your @CoinbaseDev onchain reputation score is {reputation.score}! That's so based!"
-        f" I minted {name} for you! Visit https://xonin.vercel.app/ to learn more! Have fun with your fully onchain art on @base: {txLink}.'"
-        f"{metric_msg}"
-        f" Be creative in conveying the message. If you get '403 Forbidden' error, try again ensuring the message is below 280 characters!"
+            reply_id = _post_reply_direct(twitter_wrapper, tweet_id, reply_text, media_id)
+        else:
+            media_id_message = f"and attach the media_id: {media_id}" if media_id else ""
+            reply_prompt = MINT_REPLY_PROMPT.format(
+                media_id_message=media_id_message, tweet_id=tweet_id, greeting=greeting,
+                score=reputation.score, name=name, tx_link=txLink, metric_msg=metric_msg
+            )
+            logger.debug("Reply prompt: %s", reply_prompt)
+            reply_id = _send_reply_and_get_id(agent_executor, config, reply_prompt)
+    except Exception as e:
+        logger.error("Error sending mint reply for tweet %s: %s", tweet_id, e)
+
+    # Only a posted reply settles the mention, otherwise the next run retries it
+    if not reply_id:
+        logger.warning("Mint reply for tweet %s not sent, leaving it pending", tweet_id)
+        return
+
+    mention_memory.update_mention(
+        tweet_id,
+        reply_pending=False,
+        tweet_success=True,
+        minted_nft_name=name,
+        reply_id=reply_id
     )
-    print(f"Reply prompt: {reply_prompt}")
-
-    print("Sending reply tweet...")
-    for chunk in agent_executor.stream(
-        {"messages": [HumanMessage(content=reply_prompt)]}, config
-    ):
-        if "tools" in chunk:
-            response = chunk["tools"]["messages"][0].content
-            print(f"Reply response: {response}")
-            try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                json_str = response[json_start:json_end]
-                data = json.loads(json_str)
-                if "data" in data and "id" in data["data"]:
-                    reply_id = data["data"]["id"]
-            except:
-                pass
-
-    return reply_id != None, txHash, reply_id, name
-
-def send_error_reply(agent_executor, config, tweet_id, error_type, address=None, domain=None, author=None, reputation: AddressReputation=None, tagged_user=None):
-    """Send error reply tweet and return reply ID if successful."""
-    greeting = f"@{author}" if author else ""
-    if author == ADMIN_NAME and tagged_user:
-        greeting = f"@{tagged_user}" 
+
+def send_error_reply(twitter_wrapper, tweet_id, error_type, address=None, domain=None, author=None, reputation: AddressReputation=None, tagged_user=None):
+    """Send a templated error reply tweet and return reply ID if successful.
+
+    Error replies are fixed categories, so they never go through the LLM.
+    """
+    greeting = _make_greeting(author, tagged_user)
     
-    print(f"Sending error reply for {error_type}...")
-    if error_type == "invalid_address":
-        reply_prompt = (
-            f"Use post_tweet_reply to reply to tweet {tweet_id} with a message like:\n"
-            f"'Hey {greeting}! Sorry, the address {address} is not a valid. "
-            "Please make sure to provide a valid eth address or ENS/basename. You can always mint your NFT at https://xonin.vercel.app/.' Be creative in conveying this message!"
-        )
-    elif error_type == "zero_balance":
-        reply_prompt = (
-            f"Use post_tweet_reply to reply to tweet {tweet_id} with a message like:\n"
-            f"'Hey {greeting}! Sorry, the address {address} has 0 ETH balance on @base. Please provide an active address. You can always mint your NFT at https://xonin.vercel.app/.'"
-            f"Or more humorously like: 'Haiyaa {greeting}, why so poor? Get some ETH on @base first.' Be creative in conveying this message!"
-        )
-    elif error_type == "already_minted":
-        reply_prompt = (
-            f"Use post_tweet_reply to reply to tweet {tweet_id} with a message like:\n"
-            f"'Hey {greeting}! You have already minted an NFT. "
-            "This is limited to 1 NFT per user or address, don't be greedy! You can mint another one yourself at https://xonin.vercel.app/.' Be creative in conveying this message!"
-        )
-    elif error_type == "low_reputation":
-        metric_msg = ""
+    logger.info("Sending error reply for %s...", error_type)
+    metric_text = " Go mint yourself at https://xonin.vercel.app/"
+    score = None
+    if error_type == "low_reputation":
+        score = reputation.score
         if reputation.score > 0:
-            # Extract metrics from metadata
-            metadata_str = str(reputation.metadata)
-            key_metrics = {
-                "total_transactions": "transactions",
-                "unique_days_active": "days active",
-                "token_swaps_performed": "token swaps",
-                "smart_contract_deployments": "smart contracts deployed",
-                "lend_borrow_stake_transactions": "lending/borrowing actions",
-                "bridge_transactions_performed": "bridge transactions",
-                "ens_contract_interactions": "ENS interactions"
-            }
-            
-            # Find all metrics and their values
-            metrics = {}
-            for key, label in key_metrics.items():
-                match = re.search(f"{key}=(-?\d+)", metadata_str)  
-                if match:
-                    value = int(match.group(1))
-                    metrics[label] = value
+            metrics = _reputation_metrics(reputation)
 
             # Randomly choose one metric 
             if metrics:
                 key, value = random.choice(list(metrics.items()))
-                print(f"Selected metric: {value} {key}")
-                metric_msg = f" You may also use this info to suggest the user how to improve the score: '{value} {key}' or just say: 'Go mint yourself at https://xonin.vercel.app/.'"
-        print(f"Metric message: {metric_msg}")
-
-        reply_prompt = (
-            f"Use post_tweet_reply to reply to tweet {tweet_id} with a message like:\n"
-            f"'Haiyaa {greeting}, your onchain reputation score is only {reputation.score}. Why so low?"
-            f"Sorry, no free NFT for you.'"
-            f"{metric_msg}."
-            f"Be creative in conveying this message! If you get '403 Forbidden' error, try again ensuring the message is below 280 characters!"
-        )
+                logger.info("Selected metric: %s %s", value, key)
+                metric_text = f" Only {value} {key}? Level up or go mint yourself at https://xonin.vercel.app/"
 
-    reply_id = None
-    print("Sending reply tweet...")
-    for chunk in agent_executor.stream(
-        {"messages": [HumanMessage(content=reply_prompt)]}, config
-    ):
-        if "tools" in chunk:
-            response = chunk["tools"]["messages"][0].content
-            print(f"Reply response: {response}")
-            try:
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                json_str = response[json_start:json_end]
-                data = json.loads(json_str)
-                if "data" in data and "id" in data["data"]:
-                    reply_id = data["data"]["id"]
-            except:
-                pass
-    return reply_id
+    reply_text = ERROR_REPLY_TEXTS[error_type].format(
+        greeting=greeting, address=address, score=score, metric_text=metric_text
+    )
+    return _post_reply_direct(twitter_wrapper, tweet_id, reply_text)
 
 def process_tweet(agent_executor, wallet: Wallet, config, tweet, mention_memory, twitter_wrapper):
     """Process a single tweet."""
@@ -699,18 +1162,33 @@ def process_tweet(agent_executor, wallet: Wallet, config, tweet, mention_memory,
     # Get author info from tweet data
     author = tweet.get("author_username")
     author_id = tweet.get("author_id")
-    print(f"Processing tweet from @{author}")
-     
-    # Check if it's a mint request and validate address
-    address, domain, status, tagged_user = is_valid_mint_request_with_feedback(tweet_text)
-    
-    if address is None:
+    logger.info("Processing tweet from @%s", author)
+
+    # Find the address or domain first, tweets without one are not mint requests
+    candidate, tagged_user = _find_address_candidate(tweet_text)
+    if candidate is None:
         # Don't save not_mint_request mentions
         return False
-        
+
+    # Reject authors who already minted before resolving ENS or any lookup
+    if author_id != ADMIN_ID and mention_memory.has_successful_mint(author_id):
+        logger.info("User @%s has already minted an NFT", author)
+        reply_id = send_error_reply(twitter_wrapper, tweet_id, "already_minted", author=author)
+        mention_memory.add_mention(
+            tweet_id,
+            tweet_text,
+            "duplicate_request",
+            author=author,
+            author_id=author_id,
+            reply_id=reply_id
+        )
+        return True
+     
+    # Resolve and validate the address
+    address, domain, status = _validate_address(candidate)
     if status == "invalid_address":
-        print(f"Invalid address found: {address}")
-        reply_id = send_error_reply(agent_executor, config, tweet_id, "invalid_address", address, domain, author, None, tagged_user)
+        logger.info("Invalid address found: %s", address)
+        reply_id = send_error_reply(twitter_wrapper, tweet_id, "invalid_address", address, domain, author, None, tagged_user)
         mention_memory.add_mention(
             tweet_id, 
             tweet_text, 
@@ -723,13 +1201,33 @@ def process_tweet(agent_executor, wallet: Wallet, config, tweet, mention_memory,
         )
         return True
         
-    # Check ETH balance
-    balance = get_eth_balance(address)
+    # Reject addresses that already minted before any lookup, without reserving
+    if author_id != ADMIN_ID and mention_memory.has_successful_mint(author_id, address):
+        logger.info("User @%s or address %s has already minted an NFT", author, address)
+        reply_id = send_error_reply(twitter_wrapper, tweet_id, "already_minted", address, domain, author, None, tagged_user)
+        mention_memory.add_mention(
+            tweet_id,
+            tweet_text,
+            "duplicate_request",
+            author=author,
+            author_id=author_id,
+            reply_id=reply_id
+        )
+        return True
+
+    # Balance and reputation are independent, fetch them concurrently
+    balance_future = _submit_lookup(get_eth_balance, address)
+    reputation_future = _submit_lookup(check_reputation, address)
+
+    # Check ETH balance, a rejected address no longer needs its reputation
+    balance = balance_future.result()
     if balance is None:
+        reputation_future.cancel()
         return False
     if not balance > 0:
-        print(f"Zero balance address found: {address}")
-        reply_id = send_error_reply(agent_executor, config, tweet_id, "zero_balance", address, domain, author, None, tagged_user)
+        reputation_future.cancel()
+        logger.info("Zero balance address found: %s", address)
+        reply_id = send_error_reply(twitter_wrapper, tweet_id, "zero_balance", address, domain, author, None, tagged_user)
         mention_memory.add_mention(
             tweet_id, 
             tweet_text, 
@@ -743,17 +1241,16 @@ def process_tweet(agent_executor, wallet: Wallet, config, tweet, mention_memory,
         return True
 
     # Check reputation
-    reputation = check_reputation(address)
+    reputation = reputation_future.result()
     if reputation is None:
-        print(f"Error checking reputation for address: {address}")
-        exit(0)
-    
-    print(f"Reputation score: {reputation.score}")
-    print(f"Reputation metadata: {reputation.metadata}")
+        raise RuntimeError(f"Error checking reputation for address: {address}")
+
+    logger.info("Reputation score: %s", reputation.score)
+    logger.debug("Reputation metadata: %s", reputation.metadata)
 
     if reputation.score < REPUTATION_THRESHOLD:
-        print(f"Reputation score is too low: {reputation.score}")
-        reply_id = send_error_reply(agent_executor, config, tweet_id, "low_reputation", address, domain, author, reputation, tagged_user)
+        logger.info("Reputation score is too low: %s", reputation.score)
+        reply_id = send_error_reply(twitter_wrapper, tweet_id, "low_reputation", address, domain, author, reputation, tagged_user)
         mention_memory.add_mention(
             tweet_id,
             tweet_text,
@@ -766,13 +1263,15 @@ def process_tweet(agent_executor, wallet: Wallet, config, tweet, mention_memory,
         )
         return True
 
-    # Check if user or address has already minted successfully
-    if author_id != ADMIN_ID:
-        print(f"Checking if user @{author} or address {address} has already minted an NFT")
-        previous_tweet_id = mention_memory.has_successful_mint(author_id, address)
-        if previous_tweet_id:
-            print(f"User @{author} or address {address} has already minted an NFT")
-            reply_id = send_error_reply(agent_executor, config, tweet_id, "already_minted", address, domain, author, reputation, tagged_user)
+    # Reserve the mint for user and address only once the checks passed, so a
+    # request rejected for balance or reputation never blocks another one.
+    # A concurrent mint for the same user or address is waited out, not rejected.
+    reserved = author_id != ADMIN_ID
+    if reserved:
+        logger.info("Checking if user @%s or address %s has already minted an NFT", author, address)
+        if not mention_memory.reserve_mint(author_id, address):
+            logger.info("User @%s or address %s has already minted an NFT", author, address)
+            reply_id = send_error_reply(twitter_wrapper, tweet_id, "already_minted", address, domain, author, None, tagged_user)
             mention_memory.add_mention(
                 tweet_id,
                 tweet_text,
@@ -782,51 +1281,130 @@ def process_tweet(agent_executor, wallet: Wallet, config, tweet, mention_memory,
                 reply_id=reply_id
             )
             return True
-       
-    # Address is valid and has balance + reputation -> mint nft
-    print(f"Processing mint request for address: {address} and domain: {domain}")
+
     try:
-        mint_success, tx_hash, reply_id, name = process_mint_request(agent_executor, wallet, config, tweet_id, address, domain, twitter_wrapper, author, reputation, tagged_user)
-        mention_memory.add_mention(
-            tweet_id,
-            tweet_text,
-            "processed",
-            mint_success=mint_success,
-            tx_hash=tx_hash,
-            minted_nft_name=name,
-            minted_address=address,  
-            minted_domain=domain,
-            author=author,
-            author_id=author_id,
-            reply_id=reply_id
-        )
-        return True
-    except Exception as e:
-        print(f"Error in process_tweet: {e}")
-        mention_memory.add_mention(
-            tweet_id,
-            tweet_text,
-            "error",
-            mint_success=False,
-            minted_address=address,  
-            minted_domain=domain,
-            author=author,
-            author_id=author_id
-        )
-        return False
+        # Address is valid and has balance + reputation -> mint nft
+        logger.info("Processing mint request for address: %s and domain: %s", address, domain)
+        try:
+            mint_success, tx_hash, tx_link, token_id, contract_address = process_mint_request(wallet, address)
+            mention_memory.add_mention(
+                tweet_id,
+                tweet_text,
+                "processed",
+                mint_success=mint_success,
+                tx_hash=tx_hash,
+                minted_address=address,  
+                minted_domain=domain,
+                author=author,
+                author_id=author_id,
+                extra={
+                    "transaction_link": tx_link,
+                    "token_id": token_id,
+                    "contract_address": contract_address,
+                    "tagged_user": tagged_user,
+                    "reply_pending": True,
+                } if mint_success else None
+            )
+            # The NFT is minted, render and reply in the background
+            if mint_success:
+                _reply_executor.submit(finalize_mint_reply, agent_executor, wallet, config, twitter_wrapper, mention_memory, tweet_id, reputation)
+            return True
+        except Exception as e:
+            logger.error("Error in process_tweet: %s", e)
+            mention_memory.add_mention(
+                tweet_id,
+                tweet_text,
+                "error",
+                mint_success=False,
+                minted_address=address,  
+                minted_domain=domain,
+                author=author,
+                author_id=author_id
+            )
+            return False
+    finally:
+        if reserved:
+            mention_memory.release_mint(author_id, address)
+
+def _triage(tweet):
+    """Return why a tweet can be skipped without any network call, or None."""
+    if not tweet.get("id") or not tweet.get("text"):
+        return "incomplete"
+    if tweet.get("author_id") == BOT_ACCOUNT_ID:
+        return "self_mention"
+    # Most mentions are not mint requests
+    if not _may_contain_address(tweet["text"]):
+        return "not_mint_request"
+    return None
+
+async def _process_tweets(agent_executor, wallet: Wallet, config, tweets, mention_memory, twitter_wrapper):
+    """Process a batch of tweets concurrently, returning whether any was handled.
+
+    The SDKs are blocking, so each tweet runs in a worker thread; the semaphore
+    bounds how many are in flight at once.
+    """
+    # Drop duplicate, already processed and trivially rejected tweets before spawning
+    # any work, so the same tweet can never be handled by two workers at once
+    seen_ids = set()
+    fresh_tweets = []
+    for tweet in tweets:
+        tweet_id = tweet.get("id")
+        if tweet_id in seen_ids or mention_memory.is_seen(tweet_id) or mention_memory.is_processed(tweet_id):
+            continue
+        seen_ids.add(tweet_id)
+        reason = _triage(tweet)
+        if reason:
+            logger.debug("Skipping tweet %s: %s", tweet_id, reason)
+            if tweet_id:
+                mention_memory.mark_seen(tweet_id)
+            continue
+        fresh_tweets.append(tweet)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TWEETS)
+
+    async def handle(tweet):
+        async with semaphore:
+            handled = await asyncio.to_thread(process_tweet, agent_executor, wallet, config, tweet, mention_memory, twitter_wrapper)
+            # Tweets that raised stay unseen so a retry picks them up again
+            mention_memory.mark_seen(tweet.get("id"))
+            return handled
+
+    results = await asyncio.gather(*(handle(tweet) for tweet in fresh_tweets), return_exceptions=True)
+    # Re-raise only once every tweet has finished, so last_tweet_id is not advanced past a failure
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return any(results)
 
 # Init agent
 # ---------
+# Static system prompt, kept byte-identical across calls so the provider can cache it
+SYSTEM_PROMPT = (
+    "You are a helpful agent that can interact both onchain using the Coinbase Developer Platform AgentKit "
+    "and with Twitter using Twitter API. You can perform blockchain operations and social media actions. "
+    "For blockchain: If you ever need funds, you can request them from the faucet if you are on network ID "
+    "'base-sepolia'. If not, you can provide your wallet details and request funds from the user. "
+    "For Twitter: You can post tweets, read tweets, and interact with Twitter users. "
+    "Before executing your first blockchain action, get the wallet details to see what network you're on. "
+    "If there is a 5XX (internal) HTTP error code, ask the user to try again later. "
+    "If someone asks you to do something you can't do with your currently available tools, "
+    "you must say so, and encourage them to implement it themselves using the CDP SDK + Agentkit, "
+    "recommend they go to docs.cdp.coinbase.com for more information. Be concise and helpful with your "
+    "responses. Refrain from restating your tools' descriptions unless it is explicitly requested."
+)
+
 def initialize_agent():
     """Initialize the agent with CDP Agentkit."""
     # Initialize LLM.
-    llm = ChatOpenAI(model="gpt-4o-mini")
+    llm = ChatOpenAI(model="gpt-4o-mini", max_tokens=LLM_MAX_TOKENS)
 
     wallet_data = None
 
-    if os.path.exists(wallet_data_file):
+    try:
         with open(wallet_data_file) as f:
             wallet_data = f.read()
+    except FileNotFoundError:
+        pass
 
     # Configure CDP Agentkit Langchain Extension.
     values = {}
@@ -835,17 +1413,34 @@ def initialize_agent():
 
     agentkit = CdpAgentkitWrapper(**values)
 
-    # persist the agent's CDP MPC Wallet Data.
-    wallet_data = agentkit.export_wallet()
-    with open(wallet_data_file, "w") as f:
-        f.write(wallet_data)
+    # persist the agent's CDP MPC Wallet Data, only rewriting the file when it changed
+    exported_wallet_data = agentkit.export_wallet()
+    if exported_wallet_data != wallet_data:
+        # Write atomically so a crash can never leave a truncated wallet file.
+        # The seed keeps the existing file's permissions, or owner-only for a new file.
+        tmp_file = wallet_data_file + ".tmp"
+        try:
+            mode = os.stat(wallet_data_file).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o600
+        try:
+            with os.fdopen(os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode), "w") as f:
+                os.fchmod(f.fileno(), mode)
+                f.write(exported_wallet_data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, wallet_data_file)
+        except Exception:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
 
     wallet = agentkit.wallet
-    print(f"Wallet: {wallet}")
+    logger.debug("Wallet: %s", wallet)
 
     balance = get_eth_balance(wallet.default_address.address_id)
-    if balance < NFT_PRICE * Decimal("1.5") and network_id == "base-mainnet":
-        print(f"Wallet balance is too low: {balance}. Please fund {wallet.default_address.address_id} with at least {NFT_PRICE * Decimal('1.5') - balance} ETH.")
+    if balance < MIN_WALLET_BALANCE and network_id == "base-mainnet":
+        logger.warning("Wallet balance is too low: %s. Please fund %s with at least %s ETH.", balance, wallet.default_address.address_id, MIN_WALLET_BALANCE - balance)
         exit(0) 
     #check_reputation(wallet.default_address.address_id)
     #private_key = wallet.default_address.export()
@@ -878,80 +1473,108 @@ def initialize_agent():
         llm,
         tools=tools,
         checkpointer=memory,
-        state_modifier=(
-            "You are a helpful agent that can interact both onchain using the Coinbase Developer Platform AgentKit "
-            "and with Twitter using Twitter API. You can perform blockchain operations and social media actions. "
-            "For blockchain: If you ever need funds, you can request them from the faucet if you are on network ID "
-            "'base-sepolia'. If not, you can provide your wallet details and request funds from the user. "
-            "For Twitter: You can post tweets, read tweets, and interact with Twitter users. "
-            "Before executing your first blockchain action, get the wallet details to see what network you're on. "
-            "If there is a 5XX (internal) HTTP error code, ask the user to try again later. "
-            "If someone asks you to do something you can't do with your currently available tools, "
-            "you must say so, and encourage them to implement it themselves using the CDP SDK + Agentkit, "
-            "recommend they go to docs.cdp.coinbase.com for more information. Be concise and helpful with your "
-            "responses. Refrain from restating your tools' descriptions unless it is explicitly requested."
-        ),
+        state_modifier=SYSTEM_PROMPT,
     ), config
 
-    return agent_executor, wallet, config, tools, twitter_wrapper  
+    tools_by_name = {tool.name: tool for tool in tools}
+
+    return agent_executor, wallet, config, tools_by_name, twitter_wrapper  
 
 # Running modes
 # ---------
-def run_autonomous_mode(agent_executor, wallet: Wallet, config, tools, twitter_wrapper, interval):
-    """Run the agent autonomously with specified intervals."""
-    print("Starting autonomous mode with NFT minting capability...")
-    print(f"Debug mode: {DEBUG_MODE}")
-    print(f"Network ID: {network_id}")
+def _shutdown_workers():
+    """Wait for pending mint replies, then stop outstanding lookups so exit doesn't stall."""
+    _reply_executor.shutdown(wait=True)
+    _lookup_stop.set()
+    _lookup_executor.shutdown(wait=False, cancel_futures=True)
+
+def run_autonomous_mode(agent_executor, wallet: Wallet, config, tools_by_name, twitter_wrapper, min_interval, max_interval=POLL_MAX_INTERVAL):
+    """Run the agent autonomously, polling between min_interval and max_interval seconds.
+
+    A min_interval <= 0 processes a single batch of mentions and exits.
+    """
+    logger.info("Starting autonomous mode with NFT minting capability...")
+    logger.info("Debug mode: %s", DEBUG_MODE)
+    logger.info("Network ID: %s", network_id)
 
-    account_id = '1413425385937809414'
+    account_id = BOT_ACCOUNT_ID
     mention_memory = MentionMemory()
+
+    # Resume mint replies that were still pending when the bot last stopped
+    for tweet_id in mention_memory.pending_replies():
+        logger.info("Resuming pending mint reply for tweet %s", tweet_id)
+        _reply_executor.submit(finalize_mint_reply, agent_executor, wallet, config, twitter_wrapper, mention_memory, tweet_id)
     
     # Get account_mentions tool
-    account_mentions_tool = next(
-        tool for tool in tools 
-        if tool.name == "account_mentions"
-    )
+    try:
+        account_mentions_tool = tools_by_name["account_mentions"]
+    except KeyError:
+        raise KeyError("account_mentions tool not found in the Twitter toolkit") from None
     
+    poll_scheduler = PollScheduler(min_interval, max(min_interval, max_interval))
+
     while True:
         try:
             # Get mentions (either from API or dummy file)
-            all_tweets = get_all_mentions(account_mentions_tool, account_id, max_results=10, since_id=mention_memory.memory["last_tweet_id"])
-            mentions_found = False
+            all_tweets = get_all_mentions(account_mentions_tool, account_id, max_results=MENTIONS_PAGE_SIZE, since_id=mention_memory.memory["last_tweet_id"])
+            # The API returns the newest mentions first and since_id moves past all of
+            # them, so anything beyond a full page is never fetched
+            if len(all_tweets) >= MENTIONS_PAGE_SIZE:
+                logger.warning("Mentions page is full, mentions older than the newest %s are skipped", MENTIONS_PAGE_SIZE)
             
-            # Process all tweets
-            for tweet in all_tweets:
-                if process_tweet(agent_executor, wallet, config, tweet, mention_memory, twitter_wrapper):
-                    mentions_found = True
-                    time.sleep(20)
+            # Process all tweets concurrently
+            mentions_found = asyncio.run(_process_tweets(agent_executor, wallet, config, all_tweets, mention_memory, twitter_wrapper))
 
             # Update last_tweet_id after processing
             mention_memory.update_last_tweet_id(all_tweets)
 
             if not mentions_found:
-                print("No new mint requests found.")
-
-            # Save memory state before waiting
-            mention_memory.save_memory()
-            print("Saved memory checkpoint...")
-
-            # Wait before next check
-            if interval > 0:
-                print(f"Waiting {interval} seconds before next check...")
-                time.sleep(interval)
+                logger.info("No new mint requests found.")
+                # Idle tick: a good time to compact the log
+                mention_memory.compact_memory()
+
+            # Wait for pending mint replies before a single run exits
+            if min_interval <= 0:
+                _shutdown_workers()
+
+            # Sync memory state before waiting
+            mention_memory.flush()
+            logger.info("Saved memory checkpoint...")
+
+            # Wait before next check, adapting to how busy the mentions are
+            if min_interval > 0:
+                wait = poll_scheduler.next_interval(mentions_found)
+                logger.info("Waiting %.0f seconds before next check...", wait)
+                _flush_logs()
+                time.sleep(wait)
             else:
                 exit(0)
 
         except KeyboardInterrupt:
-            print("Goodbye Agent!")
-            mention_memory.save_memory()  # Final save before exiting
+            logger.info("Goodbye Agent!")
+            _shutdown_workers()
+            mention_memory.flush()  # Final sync before exiting
             sys.exit(0)
+        except MentionsRateLimitedError:
+            logger.warning("Mentions rate limited")
+            mention_memory.flush()
+            if min_interval > 0:
+                logger.info("Waiting %s seconds for the rate limit to reset...", RATE_LIMIT_BACKOFF)
+                _flush_logs()
+                time.sleep(RATE_LIMIT_BACKOFF)
+            else:
+                _shutdown_workers()
+                exit(0)
         except Exception as e:
-            print(f"Error occurred: {e}")
-            mention_memory.save_memory()  # Save on error too
-            print("Saved memory checkpoint...")
-            print("Waiting before retry...")
-            if interval > 0:
-                time.sleep(interval)
+            logger.error("Error occurred: %s", e)
+            if min_interval <= 0:
+                _shutdown_workers()
+            mention_memory.flush()  # Sync on error too
+            logger.info("Saved memory checkpoint...")
+            logger.info("Waiting before retry...")
+            if min_interval > 0:
+                _flush_logs()
+                time.sleep(poll_scheduler.interval)
             else:
                 exit(0)
 
@@ -978,15 +1601,30 @@ def run_chat_mode(agent_executor, config):
             print("Goodbye Agent!")
             sys.exit(0)
 
+def _configure_logging():
+    """Log to stderr through a buffer flushed on warnings, when full, or before idling."""
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=stream_handler
+    )
+    logging.basicConfig(level=logging.DEBUG if DEBUG_MODE else LOG_LEVEL, handlers=[buffered_handler])
+
+def _flush_logs():
+    """Flush buffered log records, e.g. before sleeping between polls."""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
 def main():
     """Start the chatbot agent."""
 
-    agent_executor, wallet, config, tools, twitter_wrapper = initialize_agent()  # Get twitter_wrapper from initialize_agent
+    agent_executor, wallet, config, tools_by_name, twitter_wrapper = initialize_agent()  # Get twitter_wrapper from initialize_agent
 
     #run_chat_mode(agent_executor=agent_executor, config=config)
-    run_autonomous_mode(agent_executor=agent_executor, wallet=wallet, config=config, tools=tools, twitter_wrapper=twitter_wrapper,interval=-1)
-    #save_svg_to_png("test", 34, "<svg width='500' height='500' viewBox='0 0 500 500' xmlns='http://www.w3.org/2000/svg' xmlns:xlink='http://www.w3.org/1999/xlink'><radialGradient id='g0' r='1' spreadMethod='reflect'><stop offset='0%' style='stop-color:#f7af63;stop-opacity:0.39'/><stop offset='100%' style='stop-color:#f7af63;stop-opacity:1'/></radialGradient><radialGradient id='g1' r='1' spreadMethod='reflect'><stop offset='0%' style='stop-color:#633d2e;stop-opacity:0.61'/><stop offset='100%' style='stop-color:#633d2e;stop-opacity:1'/></radialGradient><radialGradient id='g2' r='1' spreadMethod='reflect'><stop offset='0%' style='stop-color:#ddd9ab;stop-opacity:0.57'/><stop offset='100%' style='stop-color:#ddd9ab;stop-opacity:1'/></radialGradient><filter id='f1' width='200%' height='200%'><feOffset in='SourceGraphic' result='r' dx='40' dy='40' /><feGaussianBlur in='r' result='rb' stdDeviation='3'/><feMerge><feMergeNode in='rb' /><feMergeNode in='SourceGraphic' /></feMerge></filter><symbol id='p' viewBox='0 0 500 500'><path fill='url(#g0)' d='M250 250 s 45 -35 -28 -42 -18 -33 -34 22 -37 -12 -20 -47 -35 -12 -32 18 -49 43 18 -24 -35 26 49 -24 -17 -47 31 19 -47 -49 32 43 -36 -16 -43 -37 -46 41 40 -25 45 11 -20 19 -28 -31 24 49 14 13 46 -39 -35 -32 -38 -36 -43 -38 -29 21 -48 15 -34 33 -22 -37 -15 40 -46 -16 18 41 33 -44 -33 44 -41 29 25 13 -26 31 -30 -23 -26 -29 49 38 49 15 43 19 -25 48 -22 -26 -29 45 11 -44 -26 -26 -10 35 -44 -39 -26 -29 33 -34 12 -37 -11 -16 48 23 -20 -45 -40 -15 -43 -33 29 -12 34 22 -34 25 -29 20 -14 -40 -19 16 -14 -20 -29 -33 -37 33 34 -13 -41 29 -25 47 -33 -24 -20 48 25 43 35 39 -25 -14 10 11 -48 47 -30 35 -42 29 -17 -33 -16 -38 46 -40 12 15 -33 -26 44 27 -16 23 -40 15 -17 33 -26 -16 -17 11 -27 31 38 -19 -38 -24 25 25 -36 35 18 20 21 22 34 -30 -43 15 33 -18 22 -14 19 34 -41 39 -25 -38 -40 -15 -38 -23 24 30'/><path fill='url(#g1)' d='M250 250 s 38 25 -11 27 -22 11 -30 -12 23 -33 28 15 14 -26 -47 -49 35 48 -14 30 -28 -11 22 -10 45 -48 25 -49 26 48 -23 -45 36 40 -29 -44 -36 35 -23 -12 -43 11 -18 34 45 43 17 -25 31 -23 -18 -45 22 -33 12 -27 -30 11 -42 28 32 -29 19 -29 -31 -42 -31 -24 31 -18 30 27 24 37 33 11 47 -23 24 18 47 44 14 19 49 38 -41 26 30 11 12 10 -30 28 -46 17 -31 -28 10 -14 43 -32 26 27 34 -31 11 31 26 -26 25 -37 29 -28 -35 13 -25 49 20 -41 -42 39 -26 19 10 -37 46 22 35 -11 35 34 21 -49 45 17 -30 26 21 -48 31 -47 -34 23 -30 31 -16 -49 33 -16 41 24 -13 -26 -36 -43 18 35 37 -14 21 22 46 -29 34 -13 -11 37 29 -36 39 24 -22 38 41 28 48 29 -30 -27 24 -43 -25 -11 15 23 -32 49 19 21 11 41 11 -45 -11 -36 -16 10 -26 -23 -35 43 30 13 -22 32 -34 17 26 -47 -22 -37 11 -40 46 11 -49 24 38 12 -49 -26 21 18 19 -41 22 -19 -19 -33 33 -12 -15 43 41 29'/><path fill='url(#g2)' d='M250 250 s 36 -29 32 -43 -159 -178 -29 33 83 -104 -144 -177 -41 -154 -105 -198 -156 174 -186 -19 123 -88 -181 -75 169 -144 195 -103 -121 -195 -35 -33 19 -126 -74 170 -52 70 -187 70 -108 75 91 -61 -12 -122 192 -75 -193 -15 169 -43 -125 -19 15 -145 63 49 -72 -66 142 -187 -153 108 -13 58 -13 59 99 -175 105 -191 -164 128 -142 50 -49 -167 147 -141 -139 -22 -85 29 20 -37 -39 -178 153 97 -184 -17 -187 -31 -30 -86 14 -35 -50 102 -34 -112 189 -167 -96 -197 -86 -21 -50 115 125 -162 183 -145 27 -44 184 -67 -186 -78 -52 -13 -88 59'/></symbol><g fill='#9cddc8'><rect width='500' height='500' /><use href='#p'/></g></svg>")
+    run_autonomous_mode(agent_executor=agent_executor, wallet=wallet, config=config, tools_by_name=tools_by_name, twitter_wrapper=twitter_wrapper, min_interval=-1)
+    #save_svg_to_png("test", 34, open("assets/sample_nft.svg").read())
     
 if __name__ == "__main__":
-    print("Starting NFT Minting Agent...")
+    _configure_logging()
+    logger.info("Starting NFT Minting Agent...")
     main()